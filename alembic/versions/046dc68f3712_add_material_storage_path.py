@@ -0,0 +1,32 @@
+"""add material storage path
+
+Revision ID: 046dc68f3712
+Revises: 9d7f24c55300
+Create Date: 2026-10-14 12:21:08.640391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from project.settings import BASE_DIR, MEDIA_URL
+
+
+# revision identifiers, used by Alembic.
+revision = '046dc68f3712'
+down_revision = '9d7f24c55300'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('material', sa.Column('storage_path', sa.String(500), nullable=True))
+
+    material = sa.table('material', sa.column('file'), sa.column('storage_path'))
+    position = sa.func.locate(MEDIA_URL, material.c.file)
+    op.execute(material.update()
+               .where(position > 0)
+               .values(storage_path=sa.func.concat(BASE_DIR + '/', sa.func.substring(material.c.file, position))))
+
+
+def downgrade():
+    op.drop_column('material', 'storage_path')
@@ -0,0 +1,26 @@
+"""add material relation indexes
+
+Revision ID: 77489a5986d3
+Revises: 
+Create Date: 2026-10-14 10:12:37.418522
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '77489a5986d3'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_materialcategory_category_material', 'materialcategory', ['category', 'material'])
+    op.create_index('ix_materialuser_user_material', 'materialuser', ['user', 'material'])
+
+
+def downgrade():
+    op.drop_index('ix_materialuser_user_material', table_name='materialuser')
+    op.drop_index('ix_materialcategory_category_material', table_name='materialcategory')
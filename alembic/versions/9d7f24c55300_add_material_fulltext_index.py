@@ -0,0 +1,24 @@
+"""add material fulltext index
+
+Revision ID: 9d7f24c55300
+Revises: 77489a5986d3
+Create Date: 2026-10-14 11:03:52.905174
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d7f24c55300'
+down_revision = '77489a5986d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_material_name_author', 'material', ['name', 'author'], mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    op.drop_index('ix_material_name_author', table_name='material')
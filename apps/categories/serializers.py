@@ -2,7 +2,7 @@ from apps.categories.models import Category
 from utils import serializers
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(serializers.SerializerCacheMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
@@ -7,6 +7,7 @@ from project.permissions import IsTeacherOrAbove
 from utils import views
 from utils.exceptions import ValidationError
 from utils.permissions import IsAuthenticated
+from utils.responses import json_response
 
 category_routes = web.RouteTableDef()
 
@@ -43,14 +44,14 @@ class CategoryView(views.DetailView):
 
 @category_routes.get('/api/categories/search/')
 async def search_categories(request):
-    async with request.app['db'].acquire() as conn:
-        text = request.query.get('text')
-        if text is None:
-            raise ValidationError(dict(text='This query parameters is required'))
+    conn = request['db_conn']
+    text = request.query.get('text')
+    if text is None:
+        raise ValidationError(dict(text='This query parameters is required'))
 
-        query = Category.select().where(Category.c.name.like('%{}%'.format(text)))
-        result = await conn.execute(query)
+    query = Category.select().where(Category.c.name.like('%{}%'.format(text)))
+    result = await conn.execute(query)
 
-        serializer = CategorySerializer(many=True)
-        data = await serializer.to_json(result)
-        return web.json_response(data)
+    serializer = CategorySerializer(many=True)
+    data = await serializer.to_json(result)
+    return json_response(data)
@@ -9,12 +9,12 @@ class FolderMaterialSerializer(serializers.Serializer):
 
     async def to_json(self, result):
         json = await super(FolderMaterialSerializer, self).to_json(result)
-        async with self.context['request'].app['db'].acquire() as conn:
-            query = Material.select().where(Material.c.id == json['material'])
-            result = await conn.execute(query)
-            serializer = MaterialSerializer(context=self.context)
-            material = await serializer.to_json(result)
-            return material
+        conn = self.context['request']['db_conn']
+        query = Material.select().where(Material.c.id == json['material'])
+        result = await conn.execute(query)
+        serializer = MaterialSerializer(context=self.context)
+        material = await serializer.to_json(result)
+        return material
 
 
 class FolderSerializer(serializers.ModelSerializer):
@@ -45,26 +45,26 @@ class FolderDetailSerializer(serializers.ModelSerializer):
         json = await super(FolderDetailSerializer, self).to_json(result)
         request = self.context['request']
 
-        async with request.app['db'].acquire() as conn:
-            query = Folder.select().where(Folder.c.parent == json['id']).order_by('name')
-            result = await conn.execute(query)
-            folder_serializer = FolderSerializer(many=True, context=self.context)
-            folders = await folder_serializer.to_json(result)
-            if json['user'] != request['user'].id:
-                for folder in folders:
-                    if not folder['is_open']:
-                        folders.remove(folder)
+        conn = request['db_conn']
+        query = Folder.select().where(Folder.c.parent == json['id']).order_by('name')
+        result = await conn.execute(query)
+        folder_serializer = FolderSerializer(many=True, context=self.context)
+        folders = await folder_serializer.to_json(result)
+        if json['user'] != request['user'].id:
+            for folder in folders:
+                if not folder['is_open']:
+                    folders.remove(folder)
 
-            json['folders'] = folders
+        json['folders'] = folders
 
-            query = FolderMaterial.select().where(FolderMaterial.c.folder == json['id'])
-            result = await conn.execute(query)
-            serializer = FolderMaterialSerializer(many=True, context=self.context)
-            materials = await serializer.to_json(result)
-            if json['user'] != request['user'].id:
-                for material in materials:
-                    if not material['is_open']:
-                        materials.remove(material)
+        query = FolderMaterial.select().where(FolderMaterial.c.folder == json['id'])
+        result = await conn.execute(query)
+        serializer = FolderMaterialSerializer(many=True, context=self.context)
+        materials = await serializer.to_json(result)
+        if json['user'] != request['user'].id:
+            for material in materials:
+                if not material['is_open']:
+                    materials.remove(material)
 
-            json['materials'] = materials
-            return json
+        json['materials'] = materials
+        return json
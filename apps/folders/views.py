@@ -43,29 +43,29 @@ class FolderView(views.DetailView):
             return FolderSerializer
 
     async def _update(self, partial=False):
-        async with self.request.app['db'].acquire() as conn:
-            queryset = self.get_queryset()
-            query = self.build_query('select', queryset=queryset)
-            result = await conn.execute(query)
-            folder = await result.fetchone()
-            if folder.user != self.request['user'].id:
-                raise PermissionDenied
-            return await super(FolderView, self)._update(partial=partial)
+        conn = self.request['db_conn']
+        queryset = self.get_queryset()
+        query = self.build_query('select', queryset=queryset)
+        result = await conn.execute(query)
+        folder = await result.fetchone()
+        if folder.user != self.request['user'].id:
+            raise PermissionDenied
+        return await super(FolderView, self)._update(partial=partial)
 
     async def delete(self):
-        async with self.request.app['db'].acquire() as conn:
-            pk = self.request.match_info['pk']
-            query = Folder.select().where(Folder.c.id == pk)
-            result = await conn.execute(query)
-            folder = await result.fetchone()
-            if folder.user != self.request['user'].id:
-                raise PermissionDenied
+        conn = self.request['db_conn']
+        pk = self.request.match_info['pk']
+        query = Folder.select().where(Folder.c.id == pk)
+        result = await conn.execute(query)
+        folder = await result.fetchone()
+        if folder.user != self.request['user'].id:
+            raise PermissionDenied
 
-            query = FolderMaterial.delete().where((FolderMaterial.c.folder == pk) &
-                                                  (FolderMaterial.c.user == self.request['user'].id))
-            await conn.execute(query)
+        query = FolderMaterial.delete().where((FolderMaterial.c.folder == pk) &
+                                              (FolderMaterial.c.user == self.request['user'].id))
+        await conn.execute(query)
 
-            queryset = self.get_queryset()
-            query = self.build_query('delete', queryset=queryset)
-            await conn.execute(query)
-            return web.Response(status=204)
+        queryset = self.get_queryset()
+        query = self.build_query('delete', queryset=queryset)
+        await conn.execute(query)
+        return web.Response(status=204)
@@ -13,10 +13,12 @@ Material = sa.Table(
     sa.Column('name', sa.String(200), nullable=False),
     sa.Column('author', sa.String(200), nullable=False),
     sa.Column('file', sa.String(200), nullable=False),
+    sa.Column('storage_path', sa.String(500)),
     sa.Column('type', sa.Integer, nullable=False),
     sa.Column('extension', sa.String(10), nullable=False),
     sa.Column('deleted', sa.Boolean, nullable=False, server_default=sa.text('false')),
-    sa.Column('is_open', sa.Boolean, nullable=False, server_default=sa.text('false'))
+    sa.Column('is_open', sa.Boolean, nullable=False, server_default=sa.text('false')),
+    sa.Index('ix_material_name_author', 'name', 'author', mysql_prefix='FULLTEXT')
 )
 
 
@@ -35,7 +37,8 @@ MaterialCategory = sa.Table(
     sa.Column('id', sa.Integer, primary_key=True),
     sa.Column('material', None, sa.ForeignKey('material.id'), nullable=False),
     sa.Column('category', None, sa.ForeignKey(Category.c.id), nullable=False),
-    sa.UniqueConstraint('material', 'category', name='unique_material_category')
+    sa.UniqueConstraint('material', 'category', name='unique_material_category'),
+    sa.Index('ix_materialcategory_category_material', 'category', 'material')
 )
 
 
@@ -45,5 +48,6 @@ MaterialUser = sa.Table(
     sa.Column('material', None, sa.ForeignKey('material.id'), nullable=False),
     sa.Column('user', None, sa.ForeignKey(User.c.id), nullable=False),
     sa.Column('quick_toolbar', sa.Boolean, nullable=False, server_default=sa.text('false')),
-    sa.UniqueConstraint('material', 'user', name='unique_material_user')
+    sa.UniqueConstraint('material', 'user', name='unique_material_user'),
+    sa.Index('ix_materialuser_user_material', 'user', 'material')
 )
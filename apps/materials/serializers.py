@@ -1,7 +1,10 @@
+import sqlalchemy as sa
+
 from apps.categories.models import Category
 from apps.categories.serializers import CategorySerializer
 from apps.folders.models import Folder
 from apps.materials.models import Material, MaterialCategory, MaterialUser, Comment
+from apps.users.models import User
 from apps.users.serializers import UserSerializer
 from utils import serializers
 
@@ -18,15 +21,9 @@ class CommentSerializer(serializers.ModelSerializer):
 class MaterialCategorySerializer(serializers.Serializer):
     category = serializers.ForeignKeyField(model=Category)
 
-    async def to_json(self, result):
-        json = await super(MaterialCategorySerializer, self).to_json(result)
-        async with self.context['request'].app['db'].acquire() as conn:
-            query = Category.select().where(Category.c.id == json['category'])
-            result = await conn.execute(query)
-            serializer = CategorySerializer()
-            category = await serializer.to_json(result)
-            json = category
-            return json
+    async def row_to_json(self, row):
+        serializer = CategorySerializer(context=self.context)
+        return await serializer.cached_row_to_json(row.id, row)
 
 
 class MaterialFolderSerializer(serializers.Serializer):
@@ -37,14 +34,14 @@ class MaterialFolderSerializer(serializers.Serializer):
         self.validated_data['user'] = self.context['request']['user'].id
 
 
-class MaterialSerializer(serializers.ModelSerializer):
+class MaterialSerializer(serializers.SerializerCacheMixin, serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
     file = serializers.FileField(upload_to='materials')
     categories = MaterialCategorySerializer(many=True)
 
     class Meta:
         model = Material
-        fields = '__all__'
+        exclude = ('storage_path',)
         read_only_fields = ('auto_date', 'deleted', 'extension')
 
     async def is_valid(self, method, partial=False):
@@ -52,29 +49,71 @@ class MaterialSerializer(serializers.ModelSerializer):
         self.validated_data['owner'] = self.context['request']['user'].id
 
     async def to_json(self, result):
-        json = await super(MaterialSerializer, self).to_json(result)
+        with self.representation_cache():
+            json = await super(MaterialSerializer, self).to_json(result)
+            await self.add_relations([json])
+        return json
+
+    async def to_json_many(self, rows):
+        with self.representation_cache():
+            json = await super(MaterialSerializer, self).to_json_many(rows)
+            if json:
+                await self.add_relations(json)
+        return json
+
+    async def row_to_json(self, row):
+        row = dict(row)
+        owner = row.pop('owner', None)
+        json = await super(MaterialSerializer, self).row_to_json(row)
+        json['owner'] = owner
         request = self.context['request']
         json['file'] = '{scheme}://{host}{path}'.format(scheme=request.scheme,
                                                         host=request.host,
                                                         path=json['file'])
-
-        async with request.app['db'].acquire() as conn:
-            query = MaterialCategory.select().where(MaterialCategory.c.material == json['id'])
-            result = await conn.execute(query)
-            serializer = MaterialCategorySerializer(many=True, context=self.context)
-            categories = await serializer.to_json(result)
-            json['categories'] = categories
-
-            query = MaterialUser.select().where((MaterialUser.c.material == json['id']) &
-                                                (MaterialUser.c.user == request['user'].id))
-            result = await conn.execute(query)
-            json['quick_toolbar'] = False
-            if result.rowcount > 0:
-                json['elected'] = True
-                material_user = await result.fetchone()
-                if material_user.quick_toolbar:
-                    json['quick_toolbar'] = True
-            else:
-                json['elected'] = False
-            await result.close()
         return json
+
+    async def add_relations(self, materials):
+        request = self.context['request']
+        material_ids = [material['id'] for material in materials]
+
+        conn = request['db_conn']
+        categories = await self.get_categories(conn, material_ids)
+        owners = await self.get_owners(conn, {material['owner'] for material in materials})
+
+        query = MaterialUser.select().where((MaterialUser.c.material.in_(material_ids)) &
+                                            (MaterialUser.c.user == request['user'].id))
+        result = await conn.execute(query)
+        material_users = {}
+        async for material_user in result:
+            material_users[material_user.material] = material_user
+
+        for material in materials:
+            material['owner'] = owners.get(material['owner'])
+            material['categories'] = categories[material['id']]
+            material_user = material_users.get(material['id'])
+            material['elected'] = material_user is not None
+            material['quick_toolbar'] = material_user is not None and bool(material_user.quick_toolbar)
+
+    async def get_categories(self, conn, material_ids):
+        query = sa.select([Category, MaterialCategory.c.material])\
+            .select_from(MaterialCategory.join(Category, MaterialCategory.c.category == Category.c.id))\
+            .where(MaterialCategory.c.material.in_(material_ids))\
+            .order_by(MaterialCategory.c.id)
+        result = await conn.execute(query)
+
+        serializer = MaterialCategorySerializer(context=self.context)
+        categories = {material_id: [] for material_id in material_ids}
+        async for row in result:
+            category = await serializer.row_to_json(row)
+            categories[row.material].append(category)
+        return categories
+
+    async def get_owners(self, conn, owner_ids):
+        query = User.select().where(User.c.id.in_(owner_ids))
+        result = await conn.execute(query)
+
+        serializer = UserSerializer(context=self.context)
+        owners = {}
+        async for user in result:
+            owners[user.id] = await serializer.row_to_json(user)
+        return owners
@@ -1,25 +1,32 @@
-import json
+import asyncio
 import os
 
 from datetime import datetime
 
+import aiofiles
+import orjson
+import sqlalchemy as sa
 from aiohttp import web
 from aiohttp.web_exceptions import HTTPMethodNotAllowed
 from pymysql import IntegrityError
 from sqlalchemy import desc
 
+from apps.categories.serializers import CategorySerializer
 from apps.folders.models import FolderMaterial, Folder
 from apps.folders.serializers import FolderSerializer
 from apps.materials.models import Material, MaterialCategory, MaterialUser, Comment
 from apps.materials.serializers import MaterialSerializer, CommentSerializer, MaterialFolderSerializer
+from apps.users.serializers import UserSerializer
 from project import settings
 from project.permissions import MODERATOR, IsModeratorOrAbove
-from project.settings import MEDIA_URL, MEDIA_ROOT, CHUNK_SIZE, BASE_DIR
+from project.settings import MEDIA_URL, MEDIA_ROOT, CHUNK_SIZE
 from utils import views
+from utils.db import escape_like, has_fulltext_words, match_against
 from utils.exceptions import ValidationError, PermissionDenied
-from utils.media import generate_path_to_file, generate_file_name
+from utils.media import generate_path_to_file, create_file
 from utils.pagination import PagePagination
 from utils.permissions import IsAuthenticated
+from utils.responses import json_response
 from utils.views import get_multipart_data, get_json_data
 
 material_routes = web.RouteTableDef()
@@ -31,83 +38,97 @@ class MaterialsView(views.ListView):
     serializer_class = MaterialSerializer
 
     async def get(self):
-        async with self.request.app['db'].acquire() as conn:
-            serializer = self.get_serializer(many=True)
-            queryset = await get_queryset_by_user(self.request, conn)
-            query = self.build_query('select', queryset=queryset)
-            paginator = self.get_pagination_class()
-            if paginator is not None:
-                await paginator.check_next_page(query)
-                query = paginator.paginate_query(query)
-                query = query.order_by(desc('auto_date')).distinct()
-
-            result = await conn.execute(query)
-            data = await serializer.to_json(result)
-            if paginator is not None:
-                data = paginator.get_paginated_data(data)
-            return web.json_response(data)
+        conn = self.request['db_conn']
+        serializer = self.get_serializer()
+        queryset = get_queryset_by_user(self.request)
+        query = self.build_query('select', queryset=queryset)
+        paginator = self.get_pagination_class()
+        if paginator is not None:
+            query = paginator.paginate_query(query)
+            query = query.order_by(desc('auto_date')).distinct()
+
+        result = await conn.execute(query)
+        rows = await result.fetchall()
+        if paginator is not None:
+            rows = paginator.paginate_rows(rows)
+        data = await serializer.to_json_many(rows)
+        if paginator is not None:
+            data = paginator.get_paginated_data(data)
+        return json_response(data)
 
     async def multipart_post(self):
-        async with self.request.app['db'].acquire() as conn:
-            now = datetime.now()
-            model = self.get_model()
-            if self.request.can_read_body:
-                data = await get_multipart_data(self.request)
-            else:
-                data = {}
+        conn = self.request['db_conn']
+        now = datetime.now()
+        model = self.get_model()
+        if self.request.can_read_body:
+            data = await get_multipart_data(self.request)
+        else:
+            data = {}
 
-            try:
-                data['categories'] = json.loads(data['categories']) if data['categories'] else []
-            except json.decoder.JSONDecodeError:
-                raise ValidationError(dict(categories='JSON decode error'))
-
-            serializer = self.get_serializer(data=data)
-            await serializer.create_validate()
-
-            files = serializer.file_fields
-            for file_name, file in files.items():
-                path = generate_path_to_file(MEDIA_ROOT, file.upload_to, now.year, now.month, now.day)
-                filename = generate_file_name(path, serializer.validated_data[file_name].filename)
-
-                with open('/'.join([path, filename]), 'wb') as f:
-                    while True:
-                        chunk = serializer.validated_data[file_name].file.readline(CHUNK_SIZE)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-
-                url = '/{media_url}/{upload_to}{y}/{m}/{d}/{file_name}' \
-                      .format(media_url=MEDIA_URL, upload_to=file.upload_to + '/' if file.upload_to is not None else '',
-                              y=now.year, m=now.month, d=now.day, file_name=filename)
-                serializer.validated_data[file_name] = url
-                index = filename.rfind('.')
-                serializer.validated_data['extension'] = filename[index+1:].upper()
-
-            trans = await conn.begin()
-            try:
-                categories = serializer.validated_data.pop('categories')
-                query = model.insert().values(**serializer.validated_data)
-                insert = await conn.execute(query)
+        try:
+            data['categories'] = orjson.loads(data['categories']) if data['categories'] else []
+        except orjson.JSONDecodeError:
+            raise ValidationError(dict(categories='JSON decode error'))
+
+        serializer = self.get_serializer(data=data)
+        await serializer.create_validate()
+
+        loop = asyncio.get_event_loop()
+        files = serializer.file_fields
+        for file_name, file in files.items():
+            path = await loop.run_in_executor(None, generate_path_to_file, MEDIA_ROOT, file.upload_to,
+                                              now.year, now.month, now.day)
+            fd, filename = await loop.run_in_executor(None, create_file, path,
+                                                      serializer.validated_data[file_name].filename)
+
+            storage_path = '/'.join([path, filename])
+            async with aiofiles.open(fd, 'wb') as f:
+                while True:
+                    chunk = serializer.validated_data[file_name].file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    await f.write(chunk)
+
+            url = '/{media_url}/{upload_to}{y}/{m}/{d}/{file_name}' \
+                  .format(media_url=MEDIA_URL, upload_to=file.upload_to + '/' if file.upload_to is not None else '',
+                          y=now.year, m=now.month, d=now.day, file_name=filename)
+            serializer.validated_data[file_name] = url
+            serializer.validated_data['storage_path'] = storage_path
+            _, dot, extension = filename.rpartition('.')
+            serializer.validated_data['extension'] = extension.upper() if dot else ''
+
+        trans = await conn.begin()
+        try:
+            categories = serializer.validated_data.pop('categories')
+            query = sa.select([sa.func.current_timestamp()])
+            serializer.validated_data['auto_date'] = await conn.scalar(query)
+            query = model.insert().values(**serializer.validated_data)
+            insert = await conn.execute(query)
 
-                query = MaterialUser.insert().values(material=insert.lastrowid,
-                                                     user=self.request['user'].id)
-                await conn.execute(query)
+            query = MaterialUser.insert().values(material=insert.lastrowid,
+                                                 user=self.request['user'].id)
+            await conn.execute(query)
 
-                for category in categories:
-                    query = MaterialCategory.insert().values(material=insert.lastrowid,
-                                                             category=category['category'].id)
-                    await conn.execute(query)
-            except Exception as e:
-                await trans.rollback()
-                return web.json_response(dict(exception=e.__class__.__name__, detail=e.args))
-            else:
-                await trans.commit()
+            if categories:
+                rows = [dict(material=insert.lastrowid, category=category['category'].id)
+                        for category in categories]
+                query = MaterialCategory.insert().values(rows)
+                await conn.execute(query)
+        except Exception as e:
+            await trans.rollback()
+            return json_response(dict(exception=e.__class__.__name__, detail=e.args))
+        else:
+            await trans.commit()
 
-            queryset = model.c.id == insert.lastrowid
-            query = self.build_query('select', queryset=queryset)
-            result = await conn.execute(query)
-            data = await serializer.to_json(result)
-            return web.json_response(data, status=201)
+        material = dict(serializer.validated_data, id=insert.lastrowid, deleted=False)
+        data = await serializer.row_to_json(material)
+        data['owner'] = await UserSerializer(context=serializer.context).row_to_json(self.request['user'])
+        category_serializer = CategorySerializer(context=serializer.context)
+        data['categories'] = [await category_serializer.row_to_json(category['category'])
+                              for category in categories]
+        data['elected'] = True
+        data['quick_toolbar'] = False
+        return json_response(data, status=201)
 
 
 @material_routes.view(r'/api/materials/{pk:\d+}/')
@@ -116,48 +137,45 @@ class MaterialView(views.DetailView):
     serializer_class = MaterialSerializer
 
     async def get(self):
-        async with self.request.app['db'].acquire() as conn:
-            serializer = self.get_serializer()
-            queryset = self.get_queryset()
-            query = self.build_query('select', queryset=queryset)
-            result = await conn.execute(query)
-            data = await serializer.to_json(result)
-            if not data['is_open']:
-                if data['owner']['id'] != self.request['user'].id:
-                    raise PermissionDenied
-            return web.json_response(data)
-
-    async def delete(self):
-        async with self.request.app['db'].acquire() as conn:
-            queryset = self.get_queryset()
-            user = self.request['user']
-            query = self.build_query('select', queryset=queryset)
-            result = await conn.execute(query)
-            material = await result.fetchone()
-            if material.owner != user.id and user.role < MODERATOR:
+        conn = self.request['db_conn']
+        serializer = self.get_serializer()
+        queryset = self.get_queryset()
+        query = self.build_query('select', queryset=queryset)
+        result = await conn.execute(query)
+        data = await serializer.to_json(result)
+        if not data['is_open']:
+            if data['owner']['id'] != self.request['user'].id:
                 raise PermissionDenied
+        return json_response(data)
 
-            query = self.build_query('update', values=dict(deleted=True), queryset=queryset)
-            await conn.execute(query)
+    async def delete(self):
+        conn = self.request['db_conn']
+        queryset = self.get_queryset()
+        user = self.request['user']
+        query = self.build_query('select', queryset=queryset)
+        result = await conn.execute(query)
+        material = await result.fetchone()
+        if material.owner != user.id and user.role < MODERATOR:
+            raise PermissionDenied
 
-            query = MaterialUser.delete().where((MaterialUser.c.material == material.id) &
-                                                (MaterialUser.c.user == user.id))
-            await conn.execute(query)
+        query = self.build_query('update', values=dict(deleted=True), queryset=queryset)
+        await conn.execute(query)
 
-            query = FolderMaterial.delete().where((FolderMaterial.c.material == material.id) &
-                                                  (FolderMaterial.c.user == user.id))
-            await conn.execute(query)
+        query = MaterialUser.delete().where((MaterialUser.c.material == material.id) &
+                                            (MaterialUser.c.user == user.id))
+        await conn.execute(query)
 
-            index = material.file.find(MEDIA_URL)
-            if index != -1:
-                path = BASE_DIR + '/' + material.file[index:]
+        query = FolderMaterial.delete().where((FolderMaterial.c.material == material.id) &
+                                              (FolderMaterial.c.user == user.id))
+        await conn.execute(query)
 
-                try:
-                    os.remove(path)
-                except FileNotFoundError:
-                    pass
+        if material.storage_path is not None:
+            try:
+                await asyncio.get_event_loop().run_in_executor(None, os.remove, material.storage_path)
+            except FileNotFoundError:
+                pass
 
-            return web.Response(status=204)
+        return web.Response(status=204)
 
 
 @material_routes.view(r'/api/materials/{pk:\d+}/comments/')
@@ -171,24 +189,24 @@ class CommentsView(views.ListView):
         return Comment.c.material == pk
 
     async def post(self):
-        async with self.request.app['db'].acquire() as conn:
-            pk = self.request.match_info['pk']
-            model = self.get_model()
-            request_data = await get_json_data(self.request)
-            serializer = self.get_serializer(data=request_data)
-            await serializer.create_validate()
-
-            data = serializer.validated_data
-            data['material'] = pk
-            data['user'] = self.request['user'].id
-            query = self.build_query('create', values=data)
-            insert = await conn.execute(query)
-
-            queryset = model.c.id == insert.lastrowid
-            query = self.build_query('select', queryset=queryset)
-            result = await conn.execute(query)
-            data = await serializer.to_json(result)
-            return web.json_response(data, status=201)
+        conn = self.request['db_conn']
+        pk = self.request.match_info['pk']
+        model = self.get_model()
+        request_data = await get_json_data(self.request)
+        serializer = self.get_serializer(data=request_data)
+        await serializer.create_validate()
+
+        data = serializer.validated_data
+        data['material'] = pk
+        data['user'] = self.request['user'].id
+        query = self.build_query('create', values=data)
+        insert = await conn.execute(query)
+
+        queryset = model.c.id == insert.lastrowid
+        query = self.build_query('select', queryset=queryset)
+        result = await conn.execute(query)
+        data = await serializer.to_json(result)
+        return json_response(data, status=201)
 
 
 @material_routes.view(r'/api/materials/{material_pk:\d+}/comments/{pk:\d+}/')
@@ -218,41 +236,41 @@ class CommentView(views.DetailView):
 @material_routes.view(r'/api/materials/{pk:\d+}/folders/')
 class MaterialFoldersView(views.ListView):
     async def get(self):
-        async with self.request.app['db'].acquire() as conn:
-            pk = self.request.match_info['pk']
-            query = FolderMaterial.select().where((FolderMaterial.c.material == pk) &
-                                                  (FolderMaterial.c.user == self.request['user'].id))
-            material_folders = await conn.execute(query)
-            result = []
-            async for material_folder in material_folders:
-                query = Folder.select().where(Folder.c.id == material_folder.folder)
-                folder = await conn.execute(query)
-                folder_json = await FolderSerializer().to_json(folder)
-                parent = folder_json['parent']
-                while parent is not None:
-                    query = Folder.select().where(Folder.c.id == parent)
-                    folder_parent = await conn.execute(query)
-                    parent = await folder_parent.fetchone()
-                    folder_json['name'] = '{} / {}'.format(parent.name, folder_json['name'])
-                    parent = parent.parent
-
-                result.append(folder_json)
-            return web.json_response(result)
+        conn = self.request['db_conn']
+        pk = self.request.match_info['pk']
+        query = FolderMaterial.select().where((FolderMaterial.c.material == pk) &
+                                              (FolderMaterial.c.user == self.request['user'].id))
+        material_folders = await conn.execute(query)
+        result = []
+        async for material_folder in material_folders:
+            query = Folder.select().where(Folder.c.id == material_folder.folder)
+            folder = await conn.execute(query)
+            folder_json = await FolderSerializer().to_json(folder)
+            parent = folder_json['parent']
+            while parent is not None:
+                query = Folder.select().where(Folder.c.id == parent)
+                folder_parent = await conn.execute(query)
+                parent = await folder_parent.fetchone()
+                folder_json['name'] = '{} / {}'.format(parent.name, folder_json['name'])
+                parent = parent.parent
+
+            result.append(folder_json)
+        return json_response(result)
 
     async def post(self):
-        async with self.request.app['db'].acquire() as conn:
-            pk = self.request.match_info['pk']
-            request_data = await get_json_data(self.request)
-            serializer = MaterialFolderSerializer(data=request_data, context={'request': self.request})
-            await serializer.create_validate()
+        conn = self.request['db_conn']
+        pk = self.request.match_info['pk']
+        request_data = await get_json_data(self.request)
+        serializer = MaterialFolderSerializer(data=request_data, context={'request': self.request})
+        await serializer.create_validate()
 
-            data = serializer.validated_data
-            data['folder'] = data['folder'].id
-            data['material'] = pk
+        data = serializer.validated_data
+        data['folder'] = data['folder'].id
+        data['material'] = pk
 
-            query = FolderMaterial.insert().values(**data)
-            await conn.execute(query)
-            return web.Response()
+        query = FolderMaterial.insert().values(**data)
+        await conn.execute(query)
+        return web.Response()
 
 
 @material_routes.view(r'/api/materials/{material_pk:\d+}/folders/{pk:\d+}/')
@@ -277,58 +295,51 @@ class MaterialFolderView(views.DetailView):
 
 @material_routes.post(r'/api/materials/{pk:\d+}/add/')
 async def add_material_to_user_collection(request):
-    async with request.app['db'].acquire() as conn:
-        pk = request.match_info['pk']
-        query = MaterialUser.insert().values(material=pk, user=request['user'].id)
+    conn = request['db_conn']
+    pk = request.match_info['pk']
+    query = MaterialUser.insert().values(material=pk, user=request['user'].id)
 
-        try:
-            await conn.execute(query)
-        except IntegrityError as e:
-            if e.args[0] == 1062:
-                raise ValidationError(dict(detail='Material is already added'))
-            else:
-                raise e
-        return web.Response()
+    try:
+        await conn.execute(query)
+    except IntegrityError as e:
+        if e.args[0] == 1062:
+            raise ValidationError(dict(detail='Material is already added'))
+        else:
+            raise e
+    return web.Response()
 
 
 @material_routes.post(r'/api/materials/{pk:\d+}/remove/')
 async def remove_material_from_user_collection(request):
-    async with request.app['db'].acquire() as conn:
-        pk = request.match_info['pk']
-        query = MaterialUser.delete().where((MaterialUser.c.material == pk) &
-                                            (MaterialUser.c.user == request['user'].id))
-        await conn.execute(query)
+    conn = request['db_conn']
+    pk = request.match_info['pk']
+    query = MaterialUser.delete().where((MaterialUser.c.material == pk) &
+                                        (MaterialUser.c.user == request['user'].id))
+    await conn.execute(query)
 
-        query = FolderMaterial.delete().where((FolderMaterial.c.material == pk) &
-                                              (FolderMaterial.c.user == request['user'].id))
-        await conn.execute(query)
-        return web.Response()
+    query = FolderMaterial.delete().where((FolderMaterial.c.material == pk) &
+                                          (FolderMaterial.c.user == request['user'].id))
+    await conn.execute(query)
+    return web.Response()
 
 
 @material_routes.get('/api/materials/quick_toolbar/')
 async def get_materials_from_quick_toolbar(request):
-    async with request.app['db'].acquire() as conn:
-        query = MaterialUser.select().where(MaterialUser.c.user == request['user'].id)
-        material_users = await conn.execute(query)
-        queryset = None
-        async for material_user in material_users:
-            if material_user.quick_toolbar:
-                if queryset is not None:
-                    queryset |= (Material.c.id == material_user.material)
-                else:
-                    queryset = (Material.c.id == material_user.material)
-
-        query = Material.select().where(queryset)
-        paginator = PagePagination(settings.PAGE_LIMIT, request)
-        await paginator.check_next_page(query)
-        query = paginator.paginate_query(query)
-        query = query.order_by(desc('auto_date')).distinct()
-        result = await conn.execute(query)
-
-        serializer = MaterialSerializer(many=True, context={'request': request})
-        data = await serializer.to_json(result)
-        data = paginator.get_paginated_data(data)
-        return web.json_response(data)
+    conn = request['db_conn']
+    materials = sa.select([MaterialUser.c.material]).where((MaterialUser.c.user == request['user'].id) &
+                                                          (MaterialUser.c.quick_toolbar == True))
+    query = Material.select().where(Material.c.id.in_(materials))
+    paginator = PagePagination(settings.PAGE_LIMIT, request)
+    query = paginator.paginate_query(query)
+    query = query.order_by(desc('auto_date')).distinct()
+    result = await conn.execute(query)
+    rows = await result.fetchall()
+    rows = paginator.paginate_rows(rows)
+
+    serializer = MaterialSerializer(context={'request': request})
+    data = await serializer.to_json_many(rows)
+    data = paginator.get_paginated_data(data)
+    return json_response(data)
 
 
 @material_routes.post(r'/api/materials/{pk:\d+}/quick_toolbar/')
@@ -342,47 +353,51 @@ async def remove_material_from_quick_toolbar(request):
 
 
 async def change_status_material_quick_toolbar(request, quick_toolbar=False):
-    async with request.app['db'].acquire() as conn:
-        pk = request.match_info['pk']
-        queryset = (MaterialUser.c.material == pk) & (MaterialUser.c.user == request['user'].id)
+    conn = request['db_conn']
+    pk = request.match_info['pk']
+    queryset = (MaterialUser.c.material == pk) & (MaterialUser.c.user == request['user'].id)
 
-        query = MaterialUser.select(queryset)
-        result = await conn.execute(query)
-        if result.rowcount == 0:
-            raise ValidationError(dict(detail='This material is not locate in your collection'))
-        await result.close()
+    query = MaterialUser.select(queryset)
+    result = await conn.execute(query)
+    if result.rowcount == 0:
+        raise ValidationError(dict(detail='This material is not locate in your collection'))
+    await result.close()
 
-        query = MaterialUser.update().where(queryset).values(quick_toolbar=quick_toolbar)
-        await conn.execute(query)
-        return web.Response()
+    query = MaterialUser.update().where(queryset).values(quick_toolbar=quick_toolbar)
+    await conn.execute(query)
+    return web.Response()
 
 
 @material_routes.get('/api/materials/search/')
 async def search_materials(request):
-    async with request.app['db'].acquire() as conn:
-        text = request.query.get('text')
-        if text is None:
-            raise ValidationError(dict(text='This query parameters is required'))
-
-        queryset = await get_queryset_by_user(request, conn)
-        like = '%{}%'.format(text)
-        queryset &= ((Material.c.name.like(like)) |
-                     (Material.c.author.like(like)))
-
-        query = Material.select().where(queryset)
-        paginator = PagePagination(settings.PAGE_LIMIT, request)
-        await paginator.check_next_page(query)
-        query = paginator.paginate_query(query)
-        query = query.order_by(desc('auto_date')).distinct()
-        result = await conn.execute(query)
+    conn = request['db_conn']
+    text = request.query.get('text')
+    if text is None:
+        raise ValidationError(dict(text='This query parameters is required'))
+
+    queryset = get_queryset_by_user(request)
+    if not has_fulltext_words(text, settings.FULLTEXT_MIN_WORD_LEN, settings.FULLTEXT_STOPWORDS):
+        like = '%{}%'.format(escape_like(text))
+        queryset &= ((Material.c.name.like(like, escape='\\')) |
+                     (Material.c.author.like(like, escape='\\')))
+    else:
+        queryset &= match_against([Material.c.name, Material.c.author], text)
 
-        serializer = MaterialSerializer(many=True, context={'request': request})
-        data = await serializer.to_json(result)
-        data = paginator.get_paginated_data(data)
-        return web.json_response(data)
+    query = Material.select().where(queryset)
+    paginator = PagePagination(settings.PAGE_LIMIT, request)
+    query = paginator.paginate_query(query)
+    query = query.order_by(desc('auto_date')).distinct()
+    result = await conn.execute(query)
+    rows = await result.fetchall()
+    rows = paginator.paginate_rows(rows)
+
+    serializer = MaterialSerializer(context={'request': request})
+    data = await serializer.to_json_many(rows)
+    data = paginator.get_paginated_data(data)
+    return json_response(data)
 
 
-async def get_queryset_by_user(request, conn):
+def get_queryset_by_user(request):
     user = request.query.get('user')
     if user is None or request['user'].id != int(user):
         queryset = (Material.c.is_open == True) & (Material.c.deleted == False)
@@ -391,58 +406,26 @@ async def get_queryset_by_user(request, conn):
 
     categories = request.query.getall('category', None)
     if categories is not None:
-        category_queryset = None
-        for category in categories:
-            query = MaterialCategory.select().where(MaterialCategory.c.category == category)
-            material_categories = await conn.execute(query)
-            materials = None
-            async for material_category in material_categories:
-                if materials is not None:
-                    materials |= (Material.c.id == material_category.material)
-                else:
-                    materials = (Material.c.id == material_category.material)
-
-            if category_queryset is not None:
-                category_queryset |= materials
-            else:
-                category_queryset = materials
-
-        if category_queryset is None:
-            queryset = Material.c.id == -1
-        elif queryset is not None:
-            queryset &= category_queryset
+        materials = sa.select([MaterialCategory.c.material])\
+            .where(MaterialCategory.c.category.in_(set(categories)))
+        if queryset is not None:
+            queryset &= Material.c.id.in_(materials)
         else:
-            queryset = category_queryset
+            queryset = Material.c.id.in_(materials)
 
     types = request.query.getall('type', None)
     if types is not None:
-        type_queryset = None
-        for m_type in types:
-            if type_queryset is not None:
-                type_queryset |= (Material.c.type == m_type)
-            else:
-                type_queryset = (Material.c.type == m_type)
-
+        type_queryset = Material.c.type.in_(set(types))
         if queryset is not None:
             queryset &= type_queryset
         else:
             queryset = type_queryset
 
     if user is not None:
-        query = MaterialUser.select().where(MaterialUser.c.user == user)
-        material_users = await conn.execute(query)
-        materials = None
-        async for material_user in material_users:
-            if materials is not None:
-                materials |= (Material.c.id == material_user.material)
-            else:
-                materials = (Material.c.id == material_user.material)
-
-        if materials is None:
-            queryset = Material.c.id == -1
-        elif queryset is not None:
-            queryset &= materials
+        materials = sa.select([MaterialUser.c.material]).where(MaterialUser.c.user == user)
+        if queryset is not None:
+            queryset &= Material.c.id.in_(materials)
         else:
-            queryset = materials
+            queryset = Material.c.id.in_(materials)
 
     return queryset
@@ -12,6 +12,7 @@ from utils.exceptions import ValidationError, PermissionDenied
 from utils.hash import hash_password
 from utils.pagination import PagePagination
 from utils.permissions import AllowAny, permission_classes, IsAuthenticated
+from utils.responses import json_response
 from utils.views import get_json_data, validate_request_data
 
 user_routes = web.RouteTableDef()
@@ -60,38 +61,38 @@ class UsersView(views.ListView):
         return get_users_by_filter(self.request)
 
     async def post(self):
-        async with self.request.app['db'].acquire() as conn:
-            model = self.get_model()
-            request_data = await get_json_data(self.request)
-            serializer = UserCreateSerializer(data=request_data)
-            await serializer.create_validate()
-
-            registration = serializer.validated_data['registration']
-            if registration.is_completed:
-                raise ValidationError(dict(detail='Registration is already completed'))
-
-            data = {
-                'username': registration.username,
-                'password': registration.password,
-                'email': registration.email,
-                'first_name': registration.first_name,
-                'last_name': registration.last_name,
-                'role': serializer.validated_data['role']
-            }
-
-            query = self.build_query('create', values=data)
-            insert = await conn.execute(query)
-
-            query = Registration.update().where(Registration.c.id == registration.id).values(is_completed=True)
-            await conn.execute(query)
+        conn = self.request['db_conn']
+        model = self.get_model()
+        request_data = await get_json_data(self.request)
+        serializer = UserCreateSerializer(data=request_data)
+        await serializer.create_validate()
+
+        registration = serializer.validated_data['registration']
+        if registration.is_completed:
+            raise ValidationError(dict(detail='Registration is already completed'))
+
+        data = {
+            'username': registration.username,
+            'password': registration.password,
+            'email': registration.email,
+            'first_name': registration.first_name,
+            'last_name': registration.last_name,
+            'role': serializer.validated_data['role']
+        }
+
+        query = self.build_query('create', values=data)
+        insert = await conn.execute(query)
+
+        query = Registration.update().where(Registration.c.id == registration.id).values(is_completed=True)
+        await conn.execute(query)
 
-            queryset = model.c.id == insert.lastrowid
-            query = self.build_query('select', queryset=queryset)
-            result = await conn.execute(query)
+        queryset = model.c.id == insert.lastrowid
+        query = self.build_query('select', queryset=queryset)
+        result = await conn.execute(query)
 
-            serializer = UserSerializer()
-            data = await serializer.to_json(result)
-            return web.json_response(data, status=201)
+        serializer = UserSerializer()
+        data = await serializer.to_json(result)
+        return json_response(data, status=201)
 
 
 @user_routes.view(r'/api/users/{pk:\d+}/')
@@ -121,17 +122,17 @@ class UserView(views.DetailView):
 @user_routes.post(r'/api/users/{pk:\d+}/change_password/')
 @permission_classes([IsAuthenticated])
 async def change_password(request):
-    async with request.app['db'].acquire() as conn:
-        pk = request.match_info['pk']
-        if int(pk) != request['user'].id:
-            raise PermissionDenied
+    conn = request['db_conn']
+    pk = request.match_info['pk']
+    if int(pk) != request['user'].id:
+        raise PermissionDenied
 
-        data = await validate_request_data(request, 'password')
-        password = data['password']
+    data = await validate_request_data(request, 'password')
+    password = data['password']
 
-        query = User.update().where(User.c.id == pk).values(password=hash_password(password))
-        await conn.execute(query)
-        return web.Response()
+    query = User.update().where(User.c.id == pk).values(password=hash_password(password))
+    await conn.execute(query)
+    return web.Response()
 
 
 @user_routes.post(r'/api/users/{pk:\d+}/block/')
@@ -147,11 +148,11 @@ async def unblock_user(request):
 
 
 async def change_user_status(request, blocked=False):
-    async with request.app['db'].acquire() as conn:
-        pk = request.match_info['pk']
-        query = User.update().where(User.c.id == pk).values(blocked=blocked)
-        await conn.execute(query)
-        return web.Response()
+    conn = request['db_conn']
+    pk = request.match_info['pk']
+    query = User.update().where(User.c.id == pk).values(blocked=blocked)
+    await conn.execute(query)
+    return web.Response()
 
 
 @user_routes.post('/api/users/check_username/')
@@ -167,45 +168,45 @@ async def check_email(request):
 
 
 async def check_user_field(request, field_name):
-    async with request.app['db'].acquire() as conn:
-        data = await validate_request_data(request, field_name)
-        field = data[field_name]
-
-        attr = getattr(User.c, field_name)
-        query = User.select().where(attr == field)
-        users = await conn.execute(query)
-        if users.rowcount == 0:
-            await users.close()
-            return web.json_response(dict(free=True))
-        else:
-            await users.close()
-            return web.json_response(dict(free=False))
+    conn = request['db_conn']
+    data = await validate_request_data(request, field_name)
+    field = data[field_name]
+
+    attr = getattr(User.c, field_name)
+    query = User.select().where(attr == field)
+    users = await conn.execute(query)
+    if users.rowcount == 0:
+        await users.close()
+        return json_response(dict(free=True))
+    else:
+        await users.close()
+        return json_response(dict(free=False))
 
 
 @user_routes.get('/api/users/search/')
 async def search_users(request):
-    async with request.app['db'].acquire() as conn:
-        text = request.query.get('text')
-        if text is None:
-            raise ValidationError(dict(text='This query parameters is required'))
-
-        like = '%{}%'.format(text)
-        queryset = ((User.c.username.like(like)) |
-                    (User.c.first_name.like(like)) |
-                    (User.c.last_name.like(like)))
-
-        queryset &= get_users_by_filter(request)
-        print('QUERYSET:', queryset)
-        query = User.select().where(queryset)
-        paginator = PagePagination(settings.PAGE_LIMIT, request)
-        await paginator.check_next_page(query)
-        query = paginator.paginate_query(query)
-        result = await conn.execute(query)
-
-        serializer = UserSerializer(many=True, context={'request': request})
-        data = await serializer.to_json(result)
-        data = paginator.get_paginated_data(data)
-        return web.json_response(data)
+    conn = request['db_conn']
+    text = request.query.get('text')
+    if text is None:
+        raise ValidationError(dict(text='This query parameters is required'))
+
+    like = '%{}%'.format(text)
+    queryset = ((User.c.username.like(like)) |
+                (User.c.first_name.like(like)) |
+                (User.c.last_name.like(like)))
+
+    queryset &= get_users_by_filter(request)
+    query = User.select().where(queryset)
+    paginator = PagePagination(settings.PAGE_LIMIT, request)
+    query = paginator.paginate_query(query)
+    result = await conn.execute(query)
+    rows = await result.fetchall()
+    rows = paginator.paginate_rows(rows)
+
+    serializer = UserSerializer(context={'request': request})
+    data = await serializer.to_json_many(rows)
+    data = paginator.get_paginated_data(data)
+    return json_response(data)
 
 
 def get_users_by_filter(request):
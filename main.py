@@ -16,7 +16,7 @@ parser.add_argument('--host')
 
 if __name__ == '__main__':
 
-    app = web.Application()
+    app = web.Application(client_max_size=settings.CLIENT_MAX_SIZE)
     configure_app(app)
 
     args = parser.parse_args()
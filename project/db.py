@@ -5,7 +5,9 @@ from utils.db import CurrentDBConnection
 
 
 async def init_mysql(app):
-    mysql_engine = await create_engine(**settings.DATABASE)
+    mysql_engine = await create_engine(minsize=settings.DB_POOL_MINSIZE,
+                                       maxsize=settings.DB_POOL_MAXSIZE,
+                                       **settings.DATABASE)
     app['db'] = mysql_engine
     CurrentDBConnection.set_db_connection(mysql_engine)
 
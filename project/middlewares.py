@@ -2,14 +2,31 @@ from aiohttp import web
 
 from project import settings
 from project.settings import MEDIA_URL
+from utils.db import CurrentDBConnection
 from utils.exceptions import PermissionDenied
 from utils.permissions import AllowAny
 
 
 def setup_middlewares(app):
+    app.middlewares.append(db_connection)
     app.middlewares.append(check_permissions)
 
 
+@web.middleware
+async def db_connection(request, handler):
+    if request.method == 'OPTIONS' or MEDIA_URL in request.path:
+        return await handler(request)
+
+    async with request.app['db'].acquire() as conn:
+        request['db_conn'] = conn
+        token = CurrentDBConnection.request_connection.set(conn)
+        try:
+            resp = await handler(request)
+        finally:
+            CurrentDBConnection.request_connection.reset(token)
+    return resp
+
+
 @web.middleware
 async def check_permissions(request, handler):
     if hasattr(handler, 'get_permission_classes'):
@@ -16,6 +16,12 @@ DATABASE = {
     'charset': 'utf8',
 }
 
+# Connections are opened at startup so the first requests don't pay
+# the connect latency. A bigger pool doesn't speed up this mixed
+# read/write workload, it only moves the contention into MySQL.
+DB_POOL_MINSIZE = 10
+DB_POOL_MAXSIZE = 10
+
 REDIS = {
     'address': 'redis://localhost',
     'encoding': 'utf-8',
@@ -26,10 +32,24 @@ DEFAULT_PERMISSION_CLASSES = [IsAuthenticated]
 DEFAULT_PAGINATION_CLASS = PagePagination
 PAGE_LIMIT = 20
 
+# Searches without a word that FULLTEXT indexes (shorter words than
+# innodb_ft_min_token_size, InnoDB default stopwords) use LIKE instead.
+FULLTEXT_MIN_WORD_LEN = 3
+FULLTEXT_STOPWORDS = frozenset([
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for',
+    'from', 'how', 'i', 'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the',
+    'this', 'to', 'was', 'what', 'when', 'where', 'who', 'will', 'with', 'und', 'www',
+])
+
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = 'media'
 
 
-CHUNK_SIZE = 8192
+CHUNK_SIZE = 64 * 1024
+
+# Limit for bodies read in memory (request.json(), request.post()).
+# Every concurrent request may buffer this much RAM, multipart uploads
+# are streamed by get_multipart_data and are not affected by it.
+CLIENT_MAX_SIZE = 10 * 1024 ** 2
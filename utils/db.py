@@ -1,5 +1,12 @@
+import re
+
+import sqlalchemy as sa
+from aiocontextvars import ContextVar
+
+
 class CurrentDBConnection(object):
     db = None
+    request_connection = ContextVar('request_connection', default=None)
 
     @classmethod
     def set_db_connection(cls, db):
@@ -8,3 +15,43 @@ class CurrentDBConnection(object):
     @classmethod
     def get_db_connection(cls):
         return cls.db
+
+    @classmethod
+    def acquire(cls):
+        return _ConnectionContextManager(cls)
+
+
+class _ConnectionContextManager(object):
+    def __init__(self, current):
+        self._current = current
+        self._pool_context = None
+
+    async def __aenter__(self):
+        conn = self._current.request_connection.get()
+        if conn is not None:
+            return conn
+
+        self._pool_context = self._current.db.acquire()
+        return await self._pool_context.__aenter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._pool_context is not None:
+            await self._pool_context.__aexit__(exc_type, exc, tb)
+            self._pool_context = None
+
+
+def escape_like(text, escape='\\'):
+    for char in (escape, '%', '_'):
+        text = text.replace(char, escape + char)
+    return text
+
+
+def has_fulltext_words(text, min_word_len, stopwords=()):
+    return any(len(word) >= min_word_len and word.lower() not in stopwords
+               for word in re.findall(r'\w+', text))
+
+
+def match_against(columns, text):
+    columns = ', '.join(str(column) for column in columns)
+    clause = sa.text('MATCH ({}) AGAINST (:match_text IN NATURAL LANGUAGE MODE)'.format(columns))
+    return clause.bindparams(match_text=text)
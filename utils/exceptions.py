@@ -1,8 +1,8 @@
-import json
-
 from aiohttp.web_exceptions import HTTPException
 from aiohttp.web_response import Response
 
+from utils.responses import json_dumps
+
 
 class BaseHTTPException(HTTPException):
     default_msg = None
@@ -11,7 +11,7 @@ class BaseHTTPException(HTTPException):
     def __init__(self, data=None):
         if data is None:
             data = self.default_msg
-        data = json.dumps(data)
+        data = json_dumps(data)
         Response.__init__(self, text=data, status=self.status, content_type='application/json')
         Exception.__init__(self)
 
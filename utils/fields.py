@@ -158,8 +158,7 @@ class ForeignKeyField(Field):
             return value
 
         model = self.model
-        db = CurrentDBConnection.get_db_connection()
-        async with db.acquire() as conn:
+        async with CurrentDBConnection.acquire() as conn:
             query = model.select().where(model.c.id == value)
             result = await conn.execute(query)
             if result.rowcount == 0:
@@ -4,30 +4,26 @@ import binascii
 
 
 def generate_path_to_file(media_root, upload_to, *args):
-    if not os.path.exists(media_root):
-        os.mkdir(media_root)
-
     path = media_root
     if upload_to is not None:
         path = '{}/{}'.format(path, upload_to)
-        if not os.path.exists(path):
-            os.mkdir(path)
 
     for arg in args:
         if not isinstance(arg, str):
             arg = str(arg)
 
         path = '{}/{}'.format(path, arg)
-        if not os.path.exists(path):
-            os.mkdir(path)
 
+    os.makedirs(path, exist_ok=True)
     return path
 
 
-def generate_file_name(path, filename):
-    path_to_file = '{}/{}'.format(path, filename)
-    while os.path.exists(path_to_file):
-        filename = '{}_{}'.format(binascii.hexlify(os.urandom(5)).decode(), filename)
+def create_file(path, filename):
+    while True:
         path_to_file = '{}/{}'.format(path, filename)
-
-    return filename
+        try:
+            fd = os.open(path_to_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            filename = '{}_{}'.format(binascii.hexlify(os.urandom(5)).decode(), filename)
+        else:
+            return fd, filename
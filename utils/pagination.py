@@ -10,27 +10,25 @@ class PagePagination(object):
 
     def paginate_query(self, query):
         offset = self.page_limit * (self.page - 1)
-        query = query.limit(self.page_limit).offset(offset)
+        query = query.limit(self.page_limit + 1).offset(offset)
         return query
 
-    async def check_next_page(self, query):
-        async with self.request.app['db'].acquire() as conn:
-            offset = self.page_limit * self.page
-            query = query.limit(1).offset(offset)
-            result = await conn.execute(query)
-
-            query_params = ''
-            for param, value in self.request.query.items():
-                if param != 'page':
-                    query_params += '{}={}&'.format(param, value)
-
-            if result.rowcount > 0:
-                self.next_page = '{scheme}://{host}{path}?{query}page={page}'\
-                                 .format(scheme=self.request.scheme,
-                                         host=self.request.host,
-                                         path=self.request.path,
-                                         query=query_params,
-                                         page=self.page + 1)
+    def paginate_rows(self, rows):
+        if len(rows) <= self.page_limit:
+            return rows
+
+        query_params = ''
+        for param, value in self.request.query.items():
+            if param != 'page':
+                query_params += '{}={}&'.format(param, value)
+
+        self.next_page = '{scheme}://{host}{path}?{query}page={page}'\
+                         .format(scheme=self.request.scheme,
+                                 host=self.request.host,
+                                 path=self.request.path,
+                                 query=query_params,
+                                 page=self.page + 1)
+        return rows[:self.page_limit]
 
     def get_paginated_data(self, data):
         response = {
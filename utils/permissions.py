@@ -20,20 +20,20 @@ class IsAuthenticated(BasePermission):
             raise Unauthorized
 
         token = header[6:]
-        async with request.app['db'].acquire() as conn:
-            query = Token.select().where(Token.c.key == token)
+        conn = request['db_conn']
+        query = Token.select().where(Token.c.key == token)
+        result = await conn.execute(query)
+        if result.rowcount == 0:
+            raise Unauthorized(dict(detail='Invalid token'))
+        else:
+            token = await result.fetchone()
+            query = User.select().where(User.c.id == token.user)
             result = await conn.execute(query)
-            if result.rowcount == 0:
-                raise Unauthorized(dict(detail='Invalid token'))
-            else:
-                token = await result.fetchone()
-                query = User.select().where(User.c.id == token.user)
-                result = await conn.execute(query)
-                user = await result.fetchone()
-                if user.blocked:
-                    raise PermissionDenied(dict(detail='User is blocked'))
-                request['user'] = user
-                return True
+            user = await result.fetchone()
+            if user.blocked:
+                raise PermissionDenied(dict(detail='User is blocked'))
+            request['user'] = user
+            return True
 
 
 def permission_classes(permissions):
@@ -0,0 +1,11 @@
+import orjson
+
+from aiohttp import web
+
+
+def json_dumps(data):
+    return orjson.dumps(data).decode()
+
+
+def json_response(data, status=200, **kwargs):
+    return web.Response(body=orjson.dumps(data), status=status, content_type='application/json', **kwargs)
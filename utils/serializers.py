@@ -1,3 +1,5 @@
+from contextlib import contextmanager
+
 import sqlalchemy as sa
 
 from aiohttp.web_exceptions import HTTPNotFound
@@ -62,6 +64,8 @@ class SerializerMeta(type):
 
 
 class Serializer(BaseSerializer, metaclass=SerializerMeta):
+    _fast_to_json = None
+
     async def create_validate(self):
         await self.is_valid('create')
 
@@ -129,8 +133,24 @@ class Serializer(BaseSerializer, metaclass=SerializerMeta):
         if result.rowcount == 0:
             raise HTTPNotFound
 
-        json = {}
         row = await result.fetchone()
+        return await self.row_to_json(row)
+
+    async def to_json_many(self, rows):
+        json = []
+        for row in rows:
+            row_json = await self.row_to_json(row)
+            json.append(row_json)
+        return json
+
+    async def row_to_json(self, row):
+        if self._fast_to_json is not None:
+            try:
+                return self._fast_to_json(row)
+            except KeyError:
+                pass
+
+        json = {}
         for field_name, value in row.items():
             field = self.fields.get(field_name)
             if field is None or field.write_only:
@@ -185,6 +205,32 @@ class ListSerializer(BaseSerializer, metaclass=SerializerMeta):
         return json
 
 
+class SerializerCacheMixin(object):
+    representation_cache_key = '_representation_cache'
+
+    @contextmanager
+    def representation_cache(self):
+        if self.context is None or self.representation_cache_key in self.context:
+            yield
+            return
+
+        self.context[self.representation_cache_key] = {}
+        try:
+            yield
+        finally:
+            del self.context[self.representation_cache_key]
+
+    async def cached_row_to_json(self, key, row):
+        cache = self.context.get(self.representation_cache_key) if self.context is not None else None
+        if cache is None:
+            return await self.row_to_json(row)
+
+        key = (self.__class__, key)
+        if key not in cache:
+            cache[key] = await self.row_to_json(row)
+        return cache[key]
+
+
 class ModelSerializerMeta(SerializerMeta):
     _fields_mapping = {
         sa.Integer: IntegerField,
@@ -192,6 +238,16 @@ class ModelSerializerMeta(SerializerMeta):
         sa.Boolean: BooleanField,
         sa.DateTime: DateTimeField,
     }
+    _fast_representations = {
+        IntegerField: 'int({value})',
+        CharField: 'str({value})',
+        EmailField: 'str({value})',
+        PasswordField: 'str({value})',
+        BooleanField: 'bool({value})',
+        ForeignKeyField: 'int({value})',
+        FileField: 'str({value})',
+        DateTimeField: '{value}.isoformat()',
+    }
 
     def __new__(mcs, name, bases, attrs):
         if name == 'ModelSerializer':
@@ -257,7 +313,31 @@ class ModelSerializerMeta(SerializerMeta):
             field = field_cls(allow_null=c.nullable, default=default, read_only=read_only)
             attrs[c.name] = field
 
-        return super(ModelSerializerMeta, mcs).__new__(mcs, name, bases, attrs)
+        cls = super(ModelSerializerMeta, mcs).__new__(mcs, name, bases, attrs)
+        fast_to_json = mcs.compile_fast_to_json(cls._serializer_fields)
+        cls._fast_to_json = staticmethod(fast_to_json) if fast_to_json is not None else None
+        return cls
+
+    @classmethod
+    def compile_fast_to_json(mcs, fields):
+        lines = ['def fast_to_json(row):']
+        items = []
+        for index, (field_name, field) in enumerate(fields.items()):
+            if field.write_only:
+                continue
+
+            template = mcs._fast_representations.get(type(field))
+            if template is None:
+                return None
+
+            value = 'value_{}'.format(index)
+            lines.append('    {} = row[{!r}]'.format(value, field_name))
+            items.append('{!r}: {} if {} is not None else None'.format(field_name, template.format(value=value), value))
+
+        lines.append('    return {{{}}}'.format(', '.join(items)))
+        namespace = {}
+        exec('\n'.join(lines), namespace)
+        return namespace['fast_to_json']
 
 
 class ModelSerializer(Serializer, metaclass=ModelSerializerMeta):
@@ -266,8 +346,7 @@ class ModelSerializer(Serializer, metaclass=ModelSerializerMeta):
             return None
 
         model = self.Meta.model
-        db = CurrentDBConnection.get_db_connection()
-        async with db.acquire() as conn:
+        async with CurrentDBConnection.acquire() as conn:
             query = model.select().where(model.c.id == value)
             result = await conn.execute(query)
             return await self.to_json(result)
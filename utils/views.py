@@ -1,6 +1,8 @@
+import asyncio
 import tempfile
 from datetime import datetime
 
+import aiofiles
 from aiohttp import web, hdrs
 from aiohttp.web_request import FileField
 from aiohttp_cors import CorsViewMixin
@@ -8,7 +10,8 @@ from aiohttp_cors import CorsViewMixin
 from project import settings
 from project.settings import MEDIA_ROOT, MEDIA_URL, CHUNK_SIZE
 from utils.exceptions import ValidationError
-from utils.media import generate_path_to_file, generate_file_name
+from utils.media import generate_path_to_file, create_file
+from utils.responses import json_response
 
 
 class BaseView(web.View, CorsViewMixin):
@@ -87,20 +90,20 @@ class DetailView(BaseView):
     _detail = True
 
     async def get(self):
-        async with self.request.app['db'].acquire() as conn:
-            serializer = self.get_serializer()
-            queryset = self.get_queryset()
-            query = self.build_query('select', queryset=queryset)
-            result = await conn.execute(query)
-            data = await serializer.to_json(result)
-            return web.json_response(data)
+        conn = self.request['db_conn']
+        serializer = self.get_serializer()
+        queryset = self.get_queryset()
+        query = self.build_query('select', queryset=queryset)
+        result = await conn.execute(query)
+        data = await serializer.to_json(result)
+        return json_response(data)
 
     async def delete(self):
-        async with self.request.app['db'].acquire() as conn:
-            queryset = self.get_queryset()
-            query = self.build_query('delete', queryset=queryset)
-            await conn.execute(query)
-            return web.Response(status=204)
+        conn = self.request['db_conn']
+        queryset = self.get_queryset()
+        query = self.build_query('delete', queryset=queryset)
+        await conn.execute(query)
+        return web.Response(status=204)
 
     async def put(self):
         response = await self._update(partial=False)
@@ -111,101 +114,106 @@ class DetailView(BaseView):
         return response
 
     async def _update(self, partial=False):
-        async with self.request.app['db'].acquire() as conn:
-            queryset = self.get_queryset()
-            request_data = await get_json_data(self.request)
+        conn = self.request['db_conn']
+        queryset = self.get_queryset()
+        request_data = await get_json_data(self.request)
 
-            serializer = self.get_serializer(data=request_data)
-            await serializer.update_validate(partial=partial)
+        serializer = self.get_serializer(data=request_data)
+        await serializer.update_validate(partial=partial)
 
-            if serializer.validated_data:
-                query = self.build_query('update', values=serializer.validated_data, queryset=queryset)
-                await conn.execute(query)
+        if serializer.validated_data:
+            query = self.build_query('update', values=serializer.validated_data, queryset=queryset)
+            await conn.execute(query)
 
-            query = self.build_query('select', queryset=queryset)
-            result = await conn.execute(query)
-            data = await serializer.to_json(result)
-            return web.json_response(data)
+        query = self.build_query('select', queryset=queryset)
+        result = await conn.execute(query)
+        data = await serializer.to_json(result)
+        return json_response(data)
 
 
 class ListView(BaseView):
     _detail = False
 
     async def get(self):
-        async with self.request.app['db'].acquire() as conn:
-            serializer = self.get_serializer(many=True)
-            queryset = self.get_queryset()
-            query = self.build_query('select', queryset=queryset)
-
-            paginator = self.get_pagination_class()
-            if paginator is not None:
-                await paginator.check_next_page(query)
-                query = paginator.paginate_query(query)
-            query = query.order_by(self.order_by)
-
-            result = await conn.execute(query)
-            data = await serializer.to_json(result)
-            if paginator is not None:
-                data = paginator.get_paginated_data(data)
-            return web.json_response(data)
+        conn = self.request['db_conn']
+        serializer = self.get_serializer()
+        queryset = self.get_queryset()
+        query = self.build_query('select', queryset=queryset)
+
+        paginator = self.get_pagination_class()
+        if paginator is not None:
+            query = paginator.paginate_query(query)
+        query = query.order_by(self.order_by)
+
+        result = await conn.execute(query)
+        rows = await result.fetchall()
+        if paginator is not None:
+            rows = paginator.paginate_rows(rows)
+        data = await serializer.to_json_many(rows)
+        if paginator is not None:
+            data = paginator.get_paginated_data(data)
+        return json_response(data)
 
     async def post(self):
         if self.request.content_type == 'multipart/form-data':
             return await self.multipart_post()
 
-        async with self.request.app['db'].acquire() as conn:
-            model = self.get_model()
-            request_data = await get_json_data(self.request)
-            serializer = self.get_serializer(data=request_data)
-            await serializer.create_validate()
+        conn = self.request['db_conn']
+        model = self.get_model()
+        request_data = await get_json_data(self.request)
+        serializer = self.get_serializer(data=request_data)
+        await serializer.create_validate()
 
-            query = self.build_query('create', values=serializer.validated_data)
-            insert = await conn.execute(query)
+        query = self.build_query('create', values=serializer.validated_data)
+        insert = await conn.execute(query)
 
-            queryset = model.c.id == insert.lastrowid
-            query = self.build_query('select', queryset=queryset)
-            result = await conn.execute(query)
-            data = await serializer.to_json(result)
-            return web.json_response(data, status=201)
+        queryset = model.c.id == insert.lastrowid
+        query = self.build_query('select', queryset=queryset)
+        result = await conn.execute(query)
+        data = await serializer.to_json(result)
+        return json_response(data, status=201)
 
     async def multipart_post(self):
-        async with self.request.app['db'].acquire() as conn:
-            now = datetime.now()
-            model = self.get_model()
-            if self.request.can_read_body:
-                data = await get_multipart_data(self.request)
-            else:
-                data = {}
-
-            serializer = self.get_serializer(data=data)
-            await serializer.create_validate()
-
-            files = serializer.file_fields
-            for file_name, file in files.items():
-                path = generate_path_to_file(MEDIA_ROOT, file.upload_to, now.year, now.month, now.day)
-                filename = generate_file_name(path, serializer.validated_data[file_name].filename)
-
-                with open('/'.join([path, filename]), 'wb') as f:
-                    while True:
-                        chunk = serializer.validated_data[file_name].file.readline(CHUNK_SIZE)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-
-                url = '{scheme}://{host}/{media_url}/{upload_to}{y}/{m}/{d}/{file_name}' \
-                      .format(scheme=self.request.scheme, host=self.request.host, media_url=MEDIA_URL,
-                              upload_to=file.upload_to + '/' if file.upload_to is not None else '',
-                              y=now.year, m=now.month, d=now.day, file_name=filename)
-                serializer.validated_data[file_name] = url
-
-            query = model.insert().values(**serializer.validated_data)
-            insert = await conn.execute(query)
-
-            queryset = model.c.id == insert.lastrowid
-            query = self.build_query('select', queryset=queryset)
-            result = await conn.execute(query)
-            data = await serializer.to_json(result)
-            return web.json_response(data, status=201)
+        conn = self.request['db_conn']
+        now = datetime.now()
+        model = self.get_model()
+        if self.request.can_read_body:
+            data = await get_multipart_data(self.request)
+        else:
+            data = {}
+
+        serializer = self.get_serializer(data=data)
+        await serializer.create_validate()
+
+        loop = asyncio.get_event_loop()
+        files = serializer.file_fields
+        for file_name, file in files.items():
+            path = await loop.run_in_executor(None, generate_path_to_file, MEDIA_ROOT, file.upload_to,
+                                              now.year, now.month, now.day)
+            fd, filename = await loop.run_in_executor(None, create_file, path,
+                                                      serializer.validated_data[file_name].filename)
+
+            async with aiofiles.open(fd, 'wb') as f:
+                while True:
+                    chunk = serializer.validated_data[file_name].file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    await f.write(chunk)
+
+            url = '{scheme}://{host}/{media_url}/{upload_to}{y}/{m}/{d}/{file_name}' \
+                  .format(scheme=self.request.scheme, host=self.request.host, media_url=MEDIA_URL,
+                          upload_to=file.upload_to + '/' if file.upload_to is not None else '',
+                          y=now.year, m=now.month, d=now.day, file_name=filename)
+            serializer.validated_data[file_name] = url
+
+        query = model.insert().values(**serializer.validated_data)
+        insert = await conn.execute(query)
+
+        queryset = model.c.id == insert.lastrowid
+        query = self.build_query('select', queryset=queryset)
+        result = await conn.execute(query)
+        data = await serializer.to_json(result)
+        return json_response(data, status=201)
 
 
 async def get_json_data(request):
@@ -226,11 +234,12 @@ async def get_multipart_data(request):
 
         if field.filename:
             tmp = tempfile.TemporaryFile()
-            chunk = await field.read_chunk(size=2 ** 16)
-            while chunk:
-                chunk = field.decode(chunk)
-                tmp.write(chunk)
-                chunk = await field.read_chunk(size=2 ** 16)
+            while True:
+                chunk = await field.read_chunk(size=CHUNK_SIZE)
+                if chunk:
+                    tmp.write(field.decode(chunk))
+                elif field.at_eof():
+                    break
             tmp.seek(0)
 
             ff = FileField(field.name, field.filename,